@@ -1,4 +1,7 @@
-import logging, sys
+import logging, os, sys
+
+# Quiet by default; FLUJO_DEBUG=1 turns on debug logging
+LOG_LEVEL = logging.DEBUG if os.getenv("FLUJO_DEBUG") == "1" else logging.WARNING
 
 # 1) Clear any default handlers
 for h in logging.root.handlers[:]:
@@ -6,35 +9,81 @@ for h in logging.root.handlers[:]:
 
 # 2) Create a stderr-only handler
 stderr_handler = logging.StreamHandler(sys.stderr)
-stderr_handler.setLevel(logging.INFO)
+stderr_handler.setLevel(LOG_LEVEL)
 stderr_handler.setFormatter(
     logging.Formatter("%(levelname)s:%(name)s:%(message)s")
 )
 
 # 3) Attach it to the root logger
 logging.root.addHandler(stderr_handler)
-logging.root.setLevel(logging.INFO)
+logging.root.setLevel(LOG_LEVEL)
 
 # 4) Optionally suppress httpx/httpcore DEBUG noise
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 # Now import everything else
-import json, asyncio, traceback
+import json, asyncio, hashlib, stat, threading, traceback
+from collections import OrderedDict
+from types import MappingProxyType
 from typing import Dict, Any
 
 # Force unbuffered Python output
-import os
 os.environ["PYTHONUNBUFFERED"] = "1"
 
+# Prefer orjson for the JSON-RPC hot path; fall back to the stdlib
+try:
+    import orjson
+
+    def _dumps(obj, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj, sort_keys: bool = False) -> bytes:
+        return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
+import httpx
+
+# Optional vector index for the semantic chat cache
+try:
+    import hnswlib
+    import numpy as np
+except ImportError:
+    hnswlib = None
+
 # LangChain imports
-from langchain_ollama import ChatOllama
+from langchain_ollama import ChatOllama, OllamaEmbeddings
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
 
+# Chat roles mapped to LangChain message classes
+_ROLE_MAP = {"system": SystemMessage, "assistant": AIMessage, "user": HumanMessage}
+
 # Ollama configuration
 MODEL_NAME = os.getenv("OLLAMA_MODEL", "llama2")
 BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
+# Chat settings: concurrent Ollama calls and the optional exact-match cache
+CHAT_CONCURRENCY = int(os.getenv("FLUJO_CHAT_CONCURRENCY", "4"))
+CHAT_CACHE_ENABLED = os.getenv("FLUJO_CHAT_CACHE") == "1"
+CHAT_CACHE_SIZE = int(os.getenv("FLUJO_CHAT_CACHE_SIZE", "512"))
+
+# Optional semantic cache: reuse replies to paraphrased questions
+SEMANTIC_CACHE_ENABLED = os.getenv("FLUJO_SEMANTIC_CACHE") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("FLUJO_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "all-minilm")
+
+# Maximum size of a single JSON-RPC line read from stdin
+STDIN_LIMIT = 16 * 1024 * 1024
+
+# Chunk size for the thread-based stdin reader
+READ_CHUNK = 64 * 1024
+
+# Maximum number of queued responses coalesced into one stdout write
+WRITE_BATCH = 64
+
 # JSON-RPC error codes
 class JsonRpcError(Exception):
     """Base class for JSON-RPC errors."""
@@ -51,89 +100,129 @@ logger = logging.getLogger(__name__)
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+def _ok(mid, result_bytes: bytes) -> bytes:
+    """Frame a pre-serialized result as a JSON-RPC response line."""
+    return b'{"jsonrpc":"2.0","result":' + result_bytes + b',"id":' + _dumps(mid) + b'}\n'
+
+def _err(mid, code: int, message: str, data: Any = None) -> bytes:
+    """Frame a JSON-RPC error response line."""
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return b'{"jsonrpc":"2.0","error":' + _dumps(error) + b',"id":' + _dumps(mid) + b'}\n'
+
+def _num(x):
+    """Return ints and floats unchanged; coerce anything else to float."""
+    return x if type(x) in (int, float) else float(x)
+
+# Shared read-only params for requests that send none
+_EMPTY = MappingProxyType({})
+
+# Handshake announced on startup
+_HANDSHAKE_BYTES = _dumps({
+    "jsonrpc": "2.0",
+    "method": "mcp/server_ready",
+    "id": 0,
+    "params": {
+        "name": "langchain-mcp",
+        "version": "0.1.0",
+        "protocols": ["mcp/1.0"],
+        "capabilities": ["list_tools", "invoke_tool", "ping", "shutdown"]
+    }
+}) + b"\n"
+
+# Prebuilt "unknown method" response; filled with the message and id
+_METHOD_ERR_TMPL = b'{"jsonrpc":"2.0","error":{"code":-32601,"message":%s},"id":%s}\n'
+
+# Static list_tools result; the schema never changes at runtime
+_LIST_TOOLS_PAYLOAD = {
+    "tools": [
+        {
+            "name": "echo",
+            "description": "Echo back the input message",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "message": {"type": "string", "description": "Message to echo back"}
+                },
+                "required": ["message"]
+            }
+        },
+        {
+            "name": "add",
+            "description": "Add two numbers",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "a": {"type": "number", "description": "First number"},
+                    "b": {"type": "number", "description": "Second number"}
+                },
+                "required": ["a", "b"]
+            }
+        },
+        {
+            "name": "chat",
+            "description": "Chat with LangChain model",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "messages": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "role": {"type": "string"},
+                                "content": {"type": "string"}
+                            }
+                        }
+                    }
+                },
+                "required": ["messages"]
+            }
+        }
+    ]
+}
+_LIST_TOOLS_BYTES = _dumps(_LIST_TOOLS_PAYLOAD)
+
 class McpServer:
     def __init__(self):
         # Initialize LangChain chat model
         try:
-            # Test Ollama connection first
-            import httpx
-            with httpx.Client() as client:
-                response = client.get(f"{BASE_URL}/api/version")
-                if not response.is_success:
-                    raise ConnectionError(f"Failed to connect to Ollama at {BASE_URL}: {response.text}")
-                logger.info("Connected to Ollama %s", response.json().get("version", "unknown"))
-            
-            # Initialize ChatOllama with verified connection
+            # The Ollama connection is probed lazily on the first chat call.
+            # ChatOllama's ollama client holds one pooled httpx client, so
+            # connections are already reused across calls.
             self.chat_model = ChatOllama(
                 model=MODEL_NAME,
                 base_url=BASE_URL,
                 temperature=0.7,
                 stop=["Human:", "Assistant:"]
             )
-            logger.info("Initialized ChatOllama with model=%s at %s", MODEL_NAME, BASE_URL)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Initialized ChatOllama with model=%s at %s", MODEL_NAME, BASE_URL)
         except Exception as e:
             sys.stderr.write(f"Fatal error initializing ChatOllama: {str(e)}\n")
             traceback.print_exc(file=sys.stderr)
             raise
         
-        # Initialize state and method registry
+        # Initialize state; methods are dispatched in _dispatch
         self._shutdown_requested = False
-        self._methods = {
-            "list_tools":  self.list_tools,
-            "invoke_tool": self.invoke_tool,
-            "ping":        self.ping,
-            "shutdown":    self.shutdown,
-        }
+        self._reading = False
+        self._outq: asyncio.Queue = asyncio.Queue()
+        self._chat_semaphore = asyncio.Semaphore(CHAT_CONCURRENCY)
+        self._chat_cache: OrderedDict[str, str] = OrderedDict()
+        self._ollama_version = None
+        self._ollama_probed = False
+        self._semantic_cache = None
+        if SEMANTIC_CACHE_ENABLED:
+            if hnswlib is None:
+                logger.warning("FLUJO_SEMANTIC_CACHE=1 but hnswlib is not installed; "
+                               "semantic cache disabled")
+            else:
+                self._semantic_cache = SemanticCache(CHAT_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD)
     
     async def list_tools(self, **_):
         """List available tools and their descriptions."""
-        return {
-            "tools": [
-                {
-                    "name": "echo",
-                    "description": "Echo back the input message",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "message": {"type": "string", "description": "Message to echo back"}
-                        },
-                        "required": ["message"]
-                    }
-                },
-                {
-                    "name": "add",
-                    "description": "Add two numbers",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "a": {"type": "number", "description": "First number"},
-                            "b": {"type": "number", "description": "Second number"}
-                        },
-                        "required": ["a", "b"]
-                    }
-                },
-                {
-                    "name": "chat",
-                    "description": "Chat with LangChain model",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "messages": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "role": {"type": "string"},
-                                        "content": {"type": "string"}
-                                    }
-                                }
-                            }
-                        },
-                        "required": ["messages"]
-                    }
-                }
-            ]
-        }
+        return _LIST_TOOLS_PAYLOAD
     
     async def ping(self, **_):
         """Health check endpoint."""
@@ -146,87 +235,357 @@ class McpServer:
         
     async def send_handshake(self):
         """Send initial handshake response to indicate server is ready."""
-        msg = {
-            "jsonrpc": "2.0",
-            "method": "mcp/server_ready",
-            "id": 0,
-            "params": {
-                "name": "langchain-mcp",
-                "version": "0.1.0",
-                "protocols": ["mcp/1.0"],
-                "capabilities": ["list_tools", "invoke_tool", "ping", "shutdown"]
-            }
-        }
-        sys.stdout.buffer.write(json.dumps(msg).encode() + b"\n")
+        sys.stdout.buffer.write(_HANDSHAKE_BYTES)
         sys.stdout.buffer.flush()
 
     async def run(self):
         """Run the MCP server using stdio transport."""
         await self.send_handshake()
-        await self._read_loop()
+        writer = asyncio.create_task(self._write_loop())
+        # If the writer dies, stop reading; awaiting it below re-raises
+        writer.add_done_callback(
+            lambda task, main=asyncio.current_task(): self._on_writer_done(task, main)
+        )
+        self._reading = True
+        try:
+            reader = await self._open_stdin()
+            await self._read_loop(reader)
+        finally:
+            # Past this point a writer failure must surface from the await
+            # below, not as a CancelledError
+            self._reading = False
+            # Sentinel: drain what is queued, then stop the writer
+            await self._outq.put(None)
+            await writer
+
+    def _on_writer_done(self, task, main):
+        """Cancel the read loop when the writer task fails."""
+        if self._reading and not task.cancelled() and task.exception() is not None:
+            main.cancel()
+
+    async def _open_stdin(self):
+        """Attach stdin to a StreamReader.
+
+        Pipes and sockets are read by the event loop itself. Anything else
+        (Windows, a regular file as in ``mcp_server.py < requests.txt``,
+        /dev/null or a TTY) is fed from a daemon thread by ``_pump_stdin``.
+        """
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=STDIN_LIMIT)
+        if sys.platform != "win32":
+            mode = os.fstat(sys.stdin.fileno()).st_mode
+            # Character devices are excluded: epoll rejects /dev/null, and
+            # O_NONBLOCK on a TTY would leak to the shell sharing it
+            if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode):
+                try:
+                    await loop.connect_read_pipe(
+                        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+                    )
+                    return reader
+                except (ValueError, NotImplementedError, OSError):
+                    pass
+        # A daemon thread never has to be joined, so a signal can still end
+        # the process while a read is blocked
+        threading.Thread(
+            target=_pump_stdin, args=(loop, reader), name="stdin-reader", daemon=True
+        ).start()
+        return reader
 
-    async def _read_loop(self):
+    async def _read_loop(self, reader):
+        pending = set()
         while True:
-            raw = sys.stdin.buffer.readline()
+            raw = await reader.readline()
             if not raw:
-                await asyncio.sleep(0.1)
+                break
+            if not raw.strip():
                 continue
 
-            req = json.loads(raw)
-            mid    = req.get("id")
-            method = req.get("method")
-            params = req.get("params", {})
-
-            handler = self._methods.get(method)
-            if not handler:
-                resp = {
-                    "jsonrpc":"2.0",
-                    "error": {"code": -32601, "message": f"Unknown method {method}"},
-                    "id": mid
-                }
-            else:
-                result = await handler(**params)
-                resp = {"jsonrpc":"2.0","result":result,"id":mid}
-
-            sys.stdout.buffer.write(json.dumps(resp).encode() + b"\n")
-            sys.stdout.buffer.flush()
+            req = _loads(raw)
+            task = asyncio.create_task(self._dispatch(req))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
 
-            if method == "shutdown":
+            if req.get("method") == "shutdown":
                 break
+
+        # Let in-flight requests finish before the server exits
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def _dispatch(self, req):
+        """Handle a single request and write its response."""
+        mid = req.get("id")
+        try:
+            method = req["method"]
+        except KeyError:
+            await self._outq.put(_err(mid, -32600, "Invalid request: missing method"))
+            return
+        params = req.get("params") or _EMPTY
+
+        try:
+            match method:
+                case "ping":
+                    out = _ok(mid, _dumps(await self.ping(**params)))
+                case "list_tools":
+                    # Static result: frame the cached bytes without re-encoding
+                    out = _ok(mid, _LIST_TOOLS_BYTES)
+                case "invoke_tool":
+                    out = _ok(mid, _dumps(await self.invoke_tool(mid=mid, **params)))
+                case "shutdown":
+                    out = _ok(mid, _dumps(await self.shutdown(**params)))
+                case _:
+                    out = _METHOD_ERR_TMPL % (
+                        _dumps(f"Unknown method {method}"), _dumps(mid)
+                    )
+        except JsonRpcError as e:
+            out = _err(mid, e.code, e.message, e.data)
+        except Exception as e:
+            logger.exception("Error handling %s", method)
+            out = _err(mid, -32603, str(e))
+
+        await self._outq.put(out)
+
+    async def _write_loop(self):
+        """Single stdout writer; coalesces queued responses per flush."""
+        out = sys.stdout.buffer
+        out.flush()
+        fd = out.fileno()
+        while True:
+            item = await self._outq.get()
+            if item is None:
+                return
+            batch = [item]
+            done = False
+            while len(batch) < WRITE_BATCH and not self._outq.empty():
+                item = self._outq.get_nowait()
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            if hasattr(os, "writev"):
+                await self._write_frames(fd, batch)
+            else:
+                out.write(b"".join(batch))
+                out.flush()
+            if done:
+                return
     
-    async def invoke_tool(self, name: str, arguments: dict) -> Dict[str, Any]:
-        """Invoke a tool by name with the given arguments."""
+    async def _write_frames(self, fd: int, frames):
+        """Write frames to fd with writev, finishing partial writes.
+
+        stdout may be non-blocking when it shares a file description with
+        stdin (a socket or TTY), so EAGAIN waits for writability instead
+        of failing.
+        """
+        total = sum(map(len, frames))
+        rest = None
+        while True:
+            try:
+                if rest is None:
+                    # Scatter-gather: emit the whole batch without joining it first
+                    written = os.writev(fd, frames)
+                    if written == total:
+                        return
+                    rest = memoryview(b"".join(frames))[written:]
+                else:
+                    rest = rest[os.write(fd, rest):]
+                    if not rest:
+                        return
+            except BlockingIOError:
+                await self._wait_writable(fd)
+
+    @staticmethod
+    async def _wait_writable(fd: int):
+        """Wait until the event loop reports fd as writable."""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_writer(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_writer(fd)
+
+    async def invoke_tool(self, name: str, arguments: dict, *, mid: Any = None) -> Dict[str, Any]:
+        """Invoke a tool by name with the given arguments.
+
+        ``mid`` is the id of the originating request; chat tokens are
+        streamed as ``mcp/chat_token`` notifications tagged with it.
+        """
         if name == "echo":
             return {"echo": arguments.get("message", "")}
         elif name == "add":
-            a = float(arguments.get("a", 0))
-            b = float(arguments.get("b", 0))
+            a = _num(arguments.get("a", 0))
+            b = _num(arguments.get("b", 0))
             return {"sum": a + b}
         elif name == "chat":
             messages = arguments.get("messages", [])
-            # Convert messages to LangChain format
-            lc_messages = []
-            for msg in messages:
-                role = msg.get("role")
-                content = msg.get("content")
-                if role == "system":
-                    lc_messages.append(SystemMessage(content=content))
-                elif role == "assistant":
-                    lc_messages.append(AIMessage(content=content))
-                elif role == "user":
-                    lc_messages.append(HumanMessage(content=content))
-            # Call ChatOllama and return response
-            response = await self.chat_model.agenerate([lc_messages])
-            return {"response": response.generations[0][0].text}
+            key = None
+            if CHAT_CACHE_ENABLED:
+                key = self._chat_cache_key(messages)
+                cached = self._chat_cache.get(key)
+                if cached is not None:
+                    self._chat_cache.move_to_end(key)
+                    return {"response": cached}
+            semantic = None
+            if self._semantic_cache is not None:
+                semantic = await self._semantic_lookup(messages)
+                if semantic is not None and semantic[0] is not None:
+                    return {"response": semantic[0]}
+            # Convert messages to LangChain format; unknown roles are dropped
+            lc_messages = [
+                cls(content=m.get("content"))
+                for m in messages
+                if (cls := _ROLE_MAP.get(m.get("role")))
+            ]
+            await self._ensure_ready()
+            # Stream from ChatOllama, forwarding tokens as they arrive
+            parts = []
+            async with self._chat_semaphore:
+                async for chunk in self.chat_model.astream(lc_messages):
+                    token = chunk.content
+                    if not token:
+                        continue
+                    parts.append(token)
+                    if mid is not None:
+                        await self._outq.put(_dumps({
+                            "jsonrpc": "2.0",
+                            "method": "mcp/chat_token",
+                            "params": {"id": mid, "token": token}
+                        }) + b"\n")
+            text = "".join(parts)
+            if key is not None:
+                self._chat_cache[key] = text
+                if len(self._chat_cache) > CHAT_CACHE_SIZE:
+                    self._chat_cache.popitem(last=False)
+            if semantic is not None:
+                _, vector, context_key = semantic
+                self._semantic_cache.insert(vector, context_key, text)
+            return {"response": text}
         else:
             raise JsonRpcError(-32001, f"Unknown tool: {name}")
 
+    async def _ensure_ready(self):
+        """Probe the Ollama version once; failures are logged, not raised."""
+        if self._ollama_probed:
+            return
+        self._ollama_probed = True
+        try:
+            async with httpx.AsyncClient(base_url=BASE_URL) as client:
+                response = await client.get("/api/version")
+            if response.is_success:
+                self._ollama_version = response.json().get("version", "unknown")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Connected to Ollama %s", self._ollama_version)
+            else:
+                logger.warning("Ollama at %s returned %s: %s",
+                               BASE_URL, response.status_code, response.text)
+        except Exception as e:
+            logger.warning("Could not reach Ollama at %s: %s", BASE_URL, e)
+
+    async def _semantic_lookup(self, messages):
+        """Query the semantic cache with the last user message.
+
+        Returns ``(cached, vector, context_key)`` where ``cached`` is None on
+        a miss, or None if the request cannot be looked up at all.
+        """
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].get("role") == "user":
+                break
+        else:
+            return None
+        # Everything except the question must match exactly
+        context_key = self._chat_cache_key(messages[:i] + messages[i + 1:])
+        try:
+            vector = await self._semantic_cache.embed(messages[i].get("content") or "")
+        except Exception as e:
+            logger.warning("Embedding failed, skipping semantic cache: %s", e)
+            return None
+        return self._semantic_cache.lookup(vector, context_key), vector, context_key
+
+    @staticmethod
+    def _chat_cache_key(messages) -> str:
+        """Hash the normalized message list for the chat cache."""
+        normalized = _dumps(messages, sort_keys=True)
+        return hashlib.blake2b(normalized, digest_size=16).hexdigest()
+
+def _pump_stdin(loop, reader):
+    """Feed stdin to ``reader`` in large chunks; runs on a daemon thread.
+
+    One read can carry several pipelined requests; the StreamReader splits
+    them into lines on the event loop.
+    """
+    fd = sys.stdin.fileno()
+    while True:
+        try:
+            data = os.read(fd, READ_CHUNK)
+        except OSError:
+            data = b""
+        try:
+            if not data:
+                loop.call_soon_threadsafe(reader.feed_eof)
+                return
+            loop.call_soon_threadsafe(reader.feed_data, data)
+        except RuntimeError:
+            # Event loop already closed
+            return
+
+class SemanticCache:
+    """Nearest-neighbour cache of chat replies keyed by question embeddings.
+
+    Entries live in an HNSW cosine index with a fixed capacity; once full,
+    the oldest slot is overwritten. A hit also requires the rest of the
+    conversation to match, so a reply is never reused across contexts.
+    """
+
+    # Neighbours inspected per lookup when looking for a matching context
+    CANDIDATES = 4
+
+    def __init__(self, capacity: int, threshold: float):
+        self._embeddings = OllamaEmbeddings(model=EMBED_MODEL, base_url=BASE_URL)
+        self._capacity = capacity
+        self._threshold = threshold
+        self._index = None
+        self._entries: Dict[int, tuple] = {}
+        self._next = 0
+
+    async def embed(self, text: str):
+        return await self._embeddings.aembed_query(text)
+
+    def lookup(self, vector, context_key: str):
+        """Return the cached reply closest to ``vector``, or None."""
+        if not self._entries:
+            return None
+        k = min(self.CANDIDATES, len(self._entries))
+        labels, distances = self._index.knn_query(np.asarray([vector], dtype=np.float32), k=k)
+        for label, distance in zip(labels[0], distances[0]):
+            if 1.0 - distance < self._threshold:
+                break
+            cached_context, response = self._entries[int(label)]
+            if cached_context == context_key:
+                return response
+        return None
+
+    def insert(self, vector, context_key: str, response: str):
+        """Store a reply, overwriting the oldest entry when full."""
+        if self._index is None:
+            # Dimension comes from the embedding model, so build lazily
+            self._index = hnswlib.Index(space="cosine", dim=len(vector))
+            self._index.init_index(max_elements=self._capacity)
+            self._index.set_ef(max(50, self.CANDIDATES))
+        label = self._next % self._capacity
+        self._next += 1
+        self._index.add_items(np.asarray([vector], dtype=np.float32), [label])
+        self._entries[label] = (context_key, response)
+
 def is_pip_install():
     """Check if the script is being run as part of pip install."""
-    import inspect
-    for frame in inspect.stack():
-        if frame.filename.endswith('pip') or 'pip' in frame.filename:
+    # Walk raw frames; inspect.stack() would also read source lines from disk
+    frame = sys._getframe()
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.endswith('pip') or 'pip' in filename:
             return True
+        frame = frame.f_back
     return False
 
 def handle_signal(signum, frame):
@@ -243,11 +602,16 @@ if sys.platform != "win32":
     signal.signal(signal.SIGQUIT, handle_signal)
 
 if __name__ == "__main__":
-    # Set up binary mode for stdin/stdout on Windows
-    if sys.platform == "win32":
-        import msvcrt
-        msvcrt.setmode(sys.stdin.fileno(), os.O_BINARY)
-        msvcrt.setmode(sys.stdout.fileno(), os.O_BINARY)
+    # No msvcrt.setmode on Windows: the interpreter already opens the
+    # standard streams' file descriptors in O_BINARY mode at startup
+
+    # Use uvloop where available; the default loop is kept otherwise
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
 
     # run the server
     asyncio.run(McpServer().run())
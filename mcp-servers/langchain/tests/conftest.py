@@ -0,0 +1,42 @@
+"""Shared fixtures for the MCP server tests."""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mcp_server  # noqa: E402
+
+
+class FakeChatModel:
+    """Stands in for ChatOllama and records every streamed prompt.
+
+    Streams ``chunks`` when given, otherwise a single "reply to <prompt>".
+    """
+
+    def __init__(self, chunks=None):
+        self.calls = []
+        self.chunks = chunks
+
+    async def astream(self, messages):
+        prompt = messages[-1].content
+        self.calls.append(prompt)
+        chunks = self.chunks if self.chunks is not None else [f"reply to {prompt}"]
+        for token in chunks:
+            yield SimpleNamespace(content=token)
+
+
+@pytest.fixture
+def make_server(monkeypatch):
+    """Factory for McpServer instances backed by a FakeChatModel."""
+
+    def factory(chat_cache=False, chat_cache_size=512, chunks=None):
+        monkeypatch.setattr(mcp_server, "CHAT_CACHE_ENABLED", chat_cache)
+        monkeypatch.setattr(mcp_server, "CHAT_CACHE_SIZE", chat_cache_size)
+        server = mcp_server.McpServer()
+        server.chat_model = FakeChatModel(chunks)
+        server._ollama_probed = True  # no version probe against a real Ollama
+        return server
+
+    return factory
@@ -0,0 +1,60 @@
+"""Tests for the exact-match chat cache."""
+import asyncio
+
+import mcp_server
+
+
+def user(text):
+    return [{"role": "user", "content": text}]
+
+
+async def chat(server, messages):
+    result = await server.invoke_tool("chat", {"messages": messages})
+    return result["response"]
+
+
+def test_repeated_messages_skip_model(make_server):
+    server = make_server(chat_cache=True, chat_cache_size=2)
+
+    async def scenario():
+        first = await chat(server, user("hi"))
+        second = await chat(server, user("hi"))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == "reply to hi"
+    assert server.chat_model.calls == ["hi"]
+
+
+def test_oldest_entry_evicted(make_server):
+    server = make_server(chat_cache=True, chat_cache_size=2)
+
+    async def scenario():
+        await chat(server, user("a"))
+        await chat(server, user("b"))
+        await chat(server, user("a"))  # hit: "a" becomes most recent
+        await chat(server, user("c"))  # evicts "b", the oldest entry
+        await chat(server, user("a"))  # still cached
+        await chat(server, user("b"))  # evicted, so the model runs again
+
+    asyncio.run(scenario())
+    assert server.chat_model.calls == ["a", "b", "c", "b"]
+    assert len(server._chat_cache) == 2
+
+
+def test_cache_disabled(make_server):
+    server = make_server()
+
+    async def scenario():
+        await chat(server, user("hi"))
+        await chat(server, user("hi"))
+
+    asyncio.run(scenario())
+    assert server.chat_model.calls == ["hi", "hi"]
+    assert not server._chat_cache
+
+
+def test_cache_key_ignores_dict_key_order():
+    key = mcp_server.McpServer._chat_cache_key
+    assert key([{"role": "user", "content": "hi"}]) == key([{"content": "hi", "role": "user"}])
+    assert key(user("hi")) != key(user("ho"))
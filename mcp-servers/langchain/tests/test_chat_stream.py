@@ -0,0 +1,55 @@
+"""Tests for streamed mcp/chat_token notifications."""
+import asyncio
+import json
+
+
+def chat_request(mid=None):
+    request = {
+        "jsonrpc": "2.0",
+        "method": "invoke_tool",
+        "params": {
+            "name": "chat",
+            "arguments": {"messages": [{"role": "user", "content": "hi"}]},
+        },
+    }
+    if mid is not None:
+        request["id"] = mid
+    return request
+
+
+def dispatch(server, request):
+    """Run one request through _dispatch and return every queued frame."""
+    asyncio.run(server._dispatch(request))
+    frames = []
+    while not server._outq.empty():
+        frames.append(json.loads(server._outq.get_nowait()))
+    return frames
+
+
+def test_tokens_precede_response(make_server):
+    server = make_server(chunks=["Hel", "lo"])
+    frames = dispatch(server, chat_request(7))
+
+    *tokens, response = frames
+    assert [t["method"] for t in tokens] == ["mcp/chat_token"] * 2
+    assert [t["params"] for t in tokens] == [
+        {"id": 7, "token": "Hel"},
+        {"id": 7, "token": "lo"},
+    ]
+    assert all("id" not in t for t in tokens)
+    assert response == {"jsonrpc": "2.0", "result": {"response": "Hello"}, "id": 7}
+
+
+def test_empty_chunks_skipped(make_server):
+    server = make_server(chunks=["", "Hel", "", "lo", ""])
+    frames = dispatch(server, chat_request(8))
+
+    assert [f["params"]["token"] for f in frames[:-1]] == ["Hel", "lo"]
+    assert frames[-1]["result"] == {"response": "Hello"}
+
+
+def test_request_without_id_emits_no_tokens(make_server):
+    server = make_server(chunks=["Hel", "lo"])
+    frames = dispatch(server, chat_request())
+
+    assert frames == [{"jsonrpc": "2.0", "result": {"response": "Hello"}, "id": None}]
@@ -47,8 +47,17 @@ def main():
         },
         {
             "jsonrpc": "2.0",
-            "method": "shutdown",
+            "method": "invoke_tool",
             "id": 5,
+            "params": {
+                "name": "chat",
+                "arguments": {"messages": [{"role": "user", "content": "Say hello."}]}
+            }
+        },
+        {
+            "jsonrpc": "2.0",
+            "method": "shutdown",
+            "id": 6,
             "params": {}
         }
     ]
@@ -79,8 +88,17 @@ def main():
             server_proc.stdin.write(json.dumps(request).encode() + b"\n")
             server_proc.stdin.flush()
             
-            # Read response
-            response = server_proc.stdout.readline()
+            # Read response; chat streams mcp/chat_token notifications first
+            tokens = []
+            while True:
+                response = server_proc.stdout.readline()
+                message = json.loads(response)
+                if "id" in message:
+                    break
+                if message.get("method") == "mcp/chat_token":
+                    tokens.append(message["params"]["token"])
+            if tokens:
+                print(f"Streamed {len(tokens)} tokens: {''.join(tokens)!r}")
             print(f"Response: {response.decode().strip()}")
             
             # Small delay between requests
@@ -0,0 +1,87 @@
+"""Tests for the semantic chat cache."""
+import asyncio
+
+import pytest
+
+import mcp_server
+
+pytestmark = pytest.mark.skipif(mcp_server.hnswlib is None, reason="hnswlib not installed")
+
+CAPITAL = "What is the capital of France?"
+PARAPHRASE = "Which city is the capital of France?"
+EVEREST = "How tall is Mount Everest?"
+PRIME = "Name a prime number."
+
+# Fixed embeddings: PARAPHRASE is ~0.995 cosine-similar to CAPITAL,
+# everything else is orthogonal
+VECTORS = {
+    CAPITAL: [1.0, 0.0, 0.0],
+    PARAPHRASE: [0.99, 0.1, 0.0],
+    EVEREST: [0.0, 1.0, 0.0],
+    PRIME: [0.0, 0.0, 1.0],
+}
+
+
+def with_semantic_cache(server, capacity=8, threshold=0.95):
+    """Attach a SemanticCache whose embeddings come from VECTORS."""
+    cache = mcp_server.SemanticCache(capacity, threshold)
+
+    async def embed(text):
+        return VECTORS[text]
+
+    cache.embed = embed
+    server._semantic_cache = cache
+    return server
+
+
+def run_chats(server, *conversations):
+    async def scenario():
+        return [
+            (await server.invoke_tool("chat", {"messages": messages}))["response"]
+            for messages in conversations
+        ]
+
+    return asyncio.run(scenario())
+
+
+def user(text, system=None):
+    messages = [{"role": "system", "content": system}] if system else []
+    return messages + [{"role": "user", "content": text}]
+
+
+def test_paraphrase_hit(make_server):
+    server = with_semantic_cache(make_server())
+    responses = run_chats(server, user(CAPITAL), user(PARAPHRASE))
+    assert responses == [f"reply to {CAPITAL}"] * 2
+    assert server.chat_model.calls == [CAPITAL]
+
+
+def test_dissimilar_question_misses(make_server):
+    server = with_semantic_cache(make_server())
+    run_chats(server, user(CAPITAL), user(EVEREST))
+    assert server.chat_model.calls == [CAPITAL, EVEREST]
+
+
+def test_different_system_prompt_misses(make_server):
+    server = with_semantic_cache(make_server())
+    responses = run_chats(
+        server,
+        user(CAPITAL),
+        user(PARAPHRASE, system="Answer in French."),
+        user(CAPITAL, system="Answer in French."),
+    )
+    assert server.chat_model.calls == [CAPITAL, PARAPHRASE]
+    assert responses[2] == f"reply to {PARAPHRASE}"
+
+
+def test_oldest_slot_overwritten_at_capacity(make_server):
+    server = with_semantic_cache(make_server(), capacity=2)
+    run_chats(
+        server,
+        user(CAPITAL),
+        user(EVEREST),
+        user(PRIME),       # overwrites CAPITAL's slot
+        user(EVEREST),     # still cached
+        user(PARAPHRASE),  # CAPITAL is gone, so this misses
+    )
+    assert server.chat_model.calls == [CAPITAL, EVEREST, PRIME, PARAPHRASE]
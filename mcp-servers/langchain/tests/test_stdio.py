@@ -0,0 +1,59 @@
+"""Tests for the stdio transport."""
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mcp_server.py")
+
+
+def start_server(stdin):
+    return subprocess.Popen(
+        [sys.executable, "-u", SERVER],
+        stdin=stdin,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty for a blocking stdin")
+def test_signal_ends_server_during_pending_read():
+    # A TTY stdin is read on the daemon thread, as on Windows
+    master, slave = os.openpty()
+    proc = start_server(slave)
+    try:
+        assert b"mcp/server_ready" in proc.stdout.readline()
+        time.sleep(0.5)  # let the reader block in os.read
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=5) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        os.close(master)
+        os.close(slave)
+
+
+def test_devnull_stdin_is_eof():
+    with open(os.devnull, "rb") as stdin:
+        proc = start_server(stdin)
+        out, _ = proc.communicate(timeout=10)
+    assert proc.returncode == 0
+    assert [json.loads(line)["method"] for line in out.splitlines()] == ["mcp/server_ready"]
+
+
+def test_regular_file_stdin(tmp_path):
+    requests = tmp_path / "requests.txt"
+    requests.write_bytes(
+        b'{"jsonrpc":"2.0","method":"ping","id":1}\n'
+        b'{"jsonrpc":"2.0","method":"shutdown","id":2}\n'
+    )
+    with open(requests, "rb") as stdin:
+        proc = start_server(stdin)
+        out, _ = proc.communicate(timeout=10)
+    assert proc.returncode == 0
+    responses = [json.loads(line) for line in out.splitlines()[1:]]
+    assert [r["result"] for r in responses] == ["pong", "shutting down"]